@@ -1,172 +1,409 @@
-# Importações: Aqui carregamos bibliotecas necessárias para o código funcionar.
-# - logging: Para registrar mensagens (logs) durante a execução, ajudando a depurar erros.
-# - os: Para acessar variáveis do sistema (como caminhos de arquivos).
-# - pandas (pd): Biblioteca para trabalhar com dados em tabelas (DataFrames), como ler CSVs.
-# - pathlib.Path: Para lidar com caminhos de arquivos de forma segura.
-# - typing: Para definir tipos de dados (ex.: List[Dict]), tornando o código mais claro.
-# - datetime e timedelta: Para trabalhar com datas e intervalos de tempo (ex.: agendamento).
-# - airflow.decorators: Ferramentas do Airflow para criar DAGs e tarefas de forma simples.
-# - PostgresHook: Conector do Airflow para se conectar ao banco de dados PostgreSQL.
-import logging
-import os
-import pandas as pd
-
-from pathlib import Path
-from typing import List, Dict
-from datetime import datetime, timedelta
-from airflow.decorators import dag, task
-from airflow.providers.postgres.hooks.postgres import PostgresHook
-
-# Configuração de logging: Define o nível de mensagens (INFO) para registrar informações úteis.
-# Isso ajuda a ver o que está acontecendo durante a execução, como quantas linhas foram processadas.
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-
-# Constantes: Valores fixos usados no código.
-# - START_DATE: Data de início do DAG (quando ele começa a rodar).
-# - PG_CONN_ID: ID da conexão com o PostgreSQL no Airflow (definida na UI como "postgres").
-# - SALES_CSV_ENV: Nome da variável de ambiente para sobrescrever o caminho do CSV, se necessário.
-START_DATE = datetime(2025, 1, 1)
-PG_CONN_ID = "postgres"
-SALES_CSV_ENV = "SALES_CSV"
-
-# DAG (Directed Acyclic Graph): É o "plano" do pipeline no Airflow.
-# - dag_id: Nome único do pipeline.
-# - start_date: Quando começa.
-# - schedule: Frequência (aqui, "@daily" = todos os dias).
-# - catchup: Se deve executar execuções passadas (False = não).
-# - tags: Etiquetas para organizar (ex.: "etl" para extração/transformação/carga).
-@dag(
-    dag_id="sales_etl_pipeline",
-    start_date=START_DATE,
-    schedule="@daily",
-    catchup=False,
-    tags=["etl", "sales"],
-)
-def sales_etl():
-    """
-    Pipeline simples: extract -> transform -> load.
-    
-    Explicação: Um pipeline ETL (Extract, Transform, Load) é como uma receita:
-    - Extract: Pega dados de uma fonte (aqui, um arquivo CSV).
-    - Transform: Limpa e organiza os dados (ex.: calcula totais).
-    - Load: Salva os dados em um banco (aqui, PostgreSQL).
-    Este DAG roda essas etapas em sequência todos os dias.
-    """
-
-    # Tarefa 1: Extract (Extração)
-    # - Lê o arquivo CSV e retorna os dados como uma lista de dicionários.
-    # - Retries: Tenta novamente 1 vez se falhar, com delay de 1 minuto.
-    @task(retries=1, retry_delay=timedelta(minutes=1))
-    def extract() -> List[Dict]:
-        # Define o caminho padrão do CSV dentro do container Docker do Airflow.
-        # No Astro, arquivos em "include/" são acessíveis. Se a variável SALES_CSV_ENV estiver definida, usa ela.
-        default = Path("/usr/local/airflow/include/vendas.csv")
-        csv_path = Path(os.getenv(SALES_CSV_ENV, str(default)))
-
-        # Verifica se o arquivo existe. Se não, lança erro para parar o pipeline.
-        if not csv_path.exists():
-            raise FileNotFoundError(f"Arquivo CSV não encontrado: {csv_path}")
-
-        # Lê o CSV com pandas e registra quantas linhas foram extraídas.
-        df = pd.read_csv(csv_path)
-        logger.info("Extraído %d linhas do CSV", len(df))
-        return df.to_dict(orient="records")  # Converte para lista de dicionários (fácil de passar para outras tarefas).
-
-    # Tarefa 2: Transform (Transformação)
-    # - Limpa e organiza os dados: converte tipos, calcula totais, remove inválidos.
-    @task
-    def transform(rows: List[Dict]) -> List[Dict]:
-        # Converte a lista de dicionários em um DataFrame do pandas (como uma tabela).
-        df = pd.DataFrame(rows)
-        
-        # Define colunas obrigatórias (se faltar alguma, erro).
-        required = {"sale_id", "product", "quantity", "price", "sale_date"}
-        if not required.issubset(set(df.columns)):
-            raise ValueError(f"Colunas obrigatórias ausentes: {required - set(df.columns)}")
-
-        # Converte tipos de dados para garantir consistência (ex.: números inteiros).
-        df["sale_id"] = df["sale_id"].astype(int)
-        df["quantity"] = df["quantity"].astype(int)
-        df["price"] = df["price"].astype(float)
-        # Converte data para string no formato YYYY-MM-DD (compatível com banco).
-        df["sale_date"] = pd.to_datetime(df["sale_date"]).dt.strftime("%Y-%m-%d")
-        # Calcula total: quantidade * preço.
-        df["total"] = df["quantity"] * df["price"]
-
-        # Remove linhas com valores vazios nas colunas obrigatórias.
-        df = df.dropna(subset=["sale_id", "quantity", "price", "sale_date"])
-        logger.info("Transformado %d linhas válidas", len(df))
-        return df.to_dict(orient="records")
-
-    # Tarefa 3: Load (Carga)
-    # - Salva os dados no PostgreSQL.
-    # - Retries: Tenta 2 vezes se falhar, com delay de 5 minutos.
-    # - Timeout: Para se demorar mais de 1 hora.
-    @task(
-        retries=2,
-        retry_delay=timedelta(minutes=5),
-        execution_timeout=timedelta(hours=1),
-    )
-    def load(rows: List[Dict]) -> None:
-        logger.info("Recebidas %d linhas para carregar", len(rows))
-        if not rows:
-            logger.info("Nenhuma linha para carregar.")
-            return
-
-        # Conecta ao PostgreSQL usando o hook do Airflow.
-        hook = PostgresHook(postgres_conn_id=PG_CONN_ID)
-        conn = hook.get_conn()
-        
-        # SQL para criar a tabela se não existir (com colunas definidas).
-        create_sql = """
-        CREATE TABLE IF NOT EXISTS vendas (
-            sale_id INTEGER PRIMARY KEY,  -- ID único da venda.
-            product VARCHAR(255),         -- Nome do produto.
-            category VARCHAR(255),        -- Categoria (ex.: Roupas).
-            region VARCHAR(255),          -- Região (ex.: Sul).
-            quantity INTEGER,             -- Quantidade vendida.
-            price FLOAT,                  -- Preço unitário.
-            sale_date DATE,               -- Data da venda.
-            total FLOAT                   -- Total calculado (quantidade * preço).
-        );
-        """
-        with conn.cursor() as cur:
-            cur.execute(create_sql)
-        conn.commit()
-        logger.info("Tabela vendas criada/verificada")
-
-        # Prepara os dados para inserção (lista de tuplas).
-        values = [
-            (
-                r["sale_id"],
-                r["product"],
-                r["category"],
-                r["region"],
-                r["quantity"],
-                r["price"],
-                r["sale_date"],
-                r["total"],
-            )
-            for r in rows
-        ]
-        logger.info("Preparadas %d linhas para inserção", len(values))
-
-        # SQL para inserir dados, ignorando duplicatas (ON CONFLICT).
-        insert_sql = """
-        INSERT INTO vendas (sale_id, product, category, region, quantity, price, sale_date, total)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (sale_id) DO NOTHING;
-        """
-        with conn.cursor() as cur:
-            cur.executemany(insert_sql, values)
-            conn.commit()
-        logger.info("Carregadas %d linhas (ignorando duplicatas)", len(values))
-
-    # Fluxo do DAG: Define a ordem das tarefas (extract -> transform -> load).
-    raw = extract()
-    cleaned = transform(raw)
-    load(cleaned)
-
-# Executa o DAG: Isso registra o pipeline no Airflow para ser executado.
-sales_etl()
+# Importações: Aqui carregamos bibliotecas necessárias para o código funcionar.
+# - io: Para montar o buffer de texto em memória usado pelo COPY do PostgreSQL.
+# - logging: Para registrar mensagens (logs) durante a execução, ajudando a depurar erros.
+# - os: Para acessar variáveis do sistema (como caminhos de arquivos).
+# - pandas (pd): Biblioteca para trabalhar com dados em tabelas (DataFrames), como ler CSVs.
+# - pathlib.Path: Para lidar com caminhos de arquivos de forma segura.
+# - typing: Para definir tipos de dados (ex.: List[Dict]), tornando o código mais claro.
+# - datetime e timedelta: Para trabalhar com datas e intervalos de tempo (ex.: agendamento).
+# - airflow.decorators: Ferramentas do Airflow para criar DAGs e tarefas de forma simples.
+# - PostgresHook: Conector do Airflow para se conectar ao banco de dados PostgreSQL.
+import io
+import logging
+import os
+import pandas as pd
+
+from pathlib import Path
+from typing import Dict, List
+from datetime import datetime, timedelta
+from airflow.decorators import dag, task
+from airflow.providers.postgres.hooks.postgres import PostgresHook
+
+# Logger do módulo: o NÍVEL fica por conta da configuração de logging do
+# Airflow (AIRFLOW__LOGGING__LOGGING_LEVEL / logging_config_class). Fixar o
+# nível aqui com setLevel impediria o operador de subir para WARNING em
+# execuções de alto volume — os logs de DEBUG/INFO continuariam sendo
+# emitidos sempre.
+logger = logging.getLogger(__name__)
+
+# Constantes: Valores fixos usados no código.
+# - START_DATE: Data de início do DAG (quando ele começa a rodar).
+# - PG_CONN_ID: ID da conexão com o PostgreSQL no Airflow (definida na UI como "postgres").
+# - SALES_CSV_ENV: Nome da variável de ambiente para sobrescrever o caminho do CSV, se necessário.
+START_DATE = datetime(2025, 1, 1)
+PG_CONN_ID = "postgres"
+SALES_CSV_ENV = "SALES_CSV"
+# Quantas linhas do CSV cada tarefa mapeada processa. O pico de memória de
+# cada tarefa é proporcional a este valor, não ao tamanho do arquivo.
+CHUNK_ROWS_ENV = "SALES_CHUNK_ROWS"
+DEFAULT_CHUNK_ROWS = 250_000
+# Limite de tarefas de carga rodando ao mesmo tempo: cada uma abre sua
+# própria conexão com o PostgreSQL, então o teto protege o pool do banco
+# (10-20 conexões costuma ser o ponto ótimo).
+MAX_PARALLEL_LOADS = 8
+# Estratégia de inserção usada na carga:
+# - "copy" (padrão): COPY FROM STDIN na tabela staging — o caminho mais rápido.
+# - "values": INSERT preparado uma vez (PREPARE) e executado em lotes de
+#   EXECUTE via psycopg2.extras.execute_batch, útil como alternativa quando
+#   o COPY não está disponível no ambiente.
+# - "unnest": um único INSERT ... SELECT FROM unnest(arrays) por bloco,
+#   planejado uma vez só pelo PostgreSQL independentemente do tamanho do lote.
+LOAD_STRATEGY_ENV = "SALES_LOAD_STRATEGY"
+# Quantos EXECUTEs vão em cada envio pela rede na estratégia "values".
+LOAD_PAGE_SIZE_ENV = "SALES_LOAD_PAGE_SIZE"
+DEFAULT_LOAD_PAGE_SIZE = 1000
+# Ordem das colunas da tabela vendas — a mesma dos INSERTs e do COPY.
+VENDAS_COLUMNS = (
+    "sale_id",
+    "product",
+    "category",
+    "region",
+    "quantity",
+    "price",
+    "sale_date",
+    "total",
+)
+# Colunas que a validação do _transform exige em toda fatia. O frozenset vive
+# no módulo: com K fatias mapeadas, ele não é reconstruído K vezes por execução.
+_REQUIRED_COLS = ("sale_id", "product", "quantity", "price", "sale_date")
+_REQUIRED = frozenset(_REQUIRED_COLS)
+# Esquema tipado das colunas numéricas, definido UMA vez no módulo. O
+# _transform o aplica em uma única chamada DEPOIS de coagir e descartar as
+# linhas inválidas (dtype fixo direto no read_csv abortaria a fatia inteira
+# por causa de uma célula vazia ou não numérica). Também evita alargamento
+# silencioso para int64 onde basta int32, o que dobraria os bytes movidos no
+# cálculo do total. Colunas de data ficam fora: são convertidas à parte.
+_SCHEMA = {"sale_id": "int64", "quantity": "int32", "price": "float64"}
+_DATE_COLS = ["sale_date"]
+
+
+def _csv_path() -> Path:
+    """Resolve o caminho do CSV (padrão em include/, sobrescrito por SALES_CSV)."""
+    # No Astro, arquivos em "include/" são acessíveis dentro do container.
+    default = Path("/usr/local/airflow/include/vendas.csv")
+    return Path(os.getenv(SALES_CSV_ENV, str(default)))
+
+
+def _format_copy_value(value) -> str:
+    """Formata um valor para o formato texto do COPY (campos separados por tab).
+
+    O COPY do PostgreSQL usa "\\N" para representar NULL e exige que barras
+    invertidas, tabs e quebras de linha dentro dos campos sejam escapadas,
+    senão elas seriam interpretadas como separadores de campo/linha.
+    """
+    # None e NaN (valor "não é número" do pandas, que não é igual a si mesmo)
+    # viram NULL no banco.
+    if value is None or value != value:
+        return r"\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _read_chunk(csv_path: Path, skiprows: int, nrows: int) -> pd.DataFrame:
+    """Lê uma fatia do CSV (nrows linhas a partir de skiprows, sem contar o cabeçalho).
+
+    O usecols= projeta só as colunas que o pipeline usa (as demais nem são
+    lidas). Os tipos NÃO são fixados aqui de propósito: com dtype= no
+    read_csv, uma única célula vazia ou não numérica abortaria a fatia
+    inteira com um ValueError do pandas; a coerção (e o descarte das linhas
+    inválidas) fica no _transform. O range no skiprows preserva a linha 0
+    (o cabeçalho) e pula só as linhas de dados das fatias anteriores.
+    """
+    return pd.read_csv(
+        csv_path,
+        usecols=[
+            "sale_id", "product", "category", "region",
+            "quantity", "price", "sale_date",
+        ],
+        parse_dates=_DATE_COLS,
+        skiprows=range(1, skiprows + 1),
+        nrows=nrows,
+        engine="c",
+    )
+
+
+def _transform(df: pd.DataFrame) -> pd.DataFrame:
+    """Valida e limpa um bloco de vendas; devolve o DataFrame pronto para carga."""
+    # Valida as colunas obrigatórias (se faltar alguma, erro). O difference()
+    # aceita o Index do pandas direto, sem materializar um set das colunas.
+    missing = _REQUIRED.difference(df.columns)
+    if missing:
+        raise ValueError(f"Colunas obrigatórias ausentes: {missing}")
+
+    # Converte tipos de forma vetorizada. errors="coerce" transforma valores
+    # inválidos em NaN/NaT (em vez de estourar erro no meio da coluna), e o
+    # dropna logo abaixo descarta essas linhas — uma célula suja não derruba
+    # a fatia inteira. A data vira datetime64: o banco aceita datetime direto,
+    # sem precisar gerar uma string por linha.
+    for col in ("sale_id", "quantity", "price"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df["sale_date"] = pd.to_datetime(df["sale_date"], errors="coerce")
+
+    # Remove linhas com valores vazios ou inválidos nas colunas obrigatórias.
+    df = df.dropna(subset=["sale_id", "quantity", "price", "sale_date"])
+
+    # Com os NaN fora, aplica o esquema tipado em UMA chamada só (o pandas
+    # agrupa as conversões; copy=False reaproveita os buffers quando o tipo
+    # já está certo).
+    df = df.astype(_SCHEMA, copy=False)
+
+    # Com as datas válidas, reduz para objetos datetime.date em uma única
+    # passada vetorizada: o psycopg2 converte date em DATE nativamente e o
+    # str() de um date já é ISO (YYYY-MM-DD) para o formato texto do COPY —
+    # sem gerar uma string formatada por linha via strftime.
+    df["sale_date"] = df["sale_date"].dt.date
+
+    # Calcula total: quantidade * preço, em uma única passada vetorizada
+    # (quantity em int32 move metade dos bytes de um int64).
+    df["total"] = df["quantity"] * df["price"]
+    return df
+
+
+def _row_values(df: pd.DataFrame):
+    """Converte um DataFrame em lista de tuplas, na ordem das colunas da tabela.
+
+    Antes isso materializava um dicionário por linha (to_dict) e fazia 8
+    buscas de chave por registro — puro overhead de Python crescendo com N.
+    Agora as colunas são transpostas direto dos arrays do numpy, com o zip
+    iterando em C. O dtype=object no to_numpy faz o numpy devolver escalares
+    Python nativos (int, float), que o psycopg2 sabe adaptar — os escalares
+    do numpy (int64 etc.), não.
+    """
+    columns = [df[col].to_numpy(dtype=object) for col in VENDAS_COLUMNS]
+    return list(zip(*columns))
+
+
+def _insert_with_copy(cur, values) -> None:
+    """Envia um lote para a tabela staging via COPY FROM STDIN (padrão).
+
+    Em vez de um INSERT por linha (uma ida e volta ao banco para cada
+    registro), o COPY envia o lote inteiro de uma vez pelo protocolo de
+    carga do PostgreSQL.
+    """
+    # Monta um buffer de texto em memória no formato que o COPY espera:
+    # uma linha por registro, campos separados por tab.
+    buf = io.StringIO()
+    for row in values:
+        buf.write("\t".join(_format_copy_value(v) for v in row))
+        buf.write("\n")
+    buf.seek(0)
+    cur.copy_expert("COPY vendas_stage FROM STDIN WITH (FORMAT text)", buf)
+
+
+def _insert_with_values(cur, values) -> None:
+    """Envia um lote para a staging com comando preparado + EXECUTEs em lote.
+
+    O PREPARE faz o servidor analisar e planejar o INSERT UMA vez por
+    conexão; depois cada linha custa só um "EXECUTE ins_vendas_stage (...)".
+    O execute_batch junta até LOAD_PAGE_SIZE EXECUTEs em um único envio pela
+    rede, diluindo a latência entre muitas linhas — bem mais rápido que o
+    executemany do psycopg2, que é só um laço Python de execute().
+    """
+    # Import dentro da função: o psycopg2 só é necessário nesta estratégia e
+    # em execução real; mantê-lo aqui deixa o import do DAG leve.
+    from psycopg2.extras import execute_batch
+
+    page_size = int(os.getenv(LOAD_PAGE_SIZE_ENV, DEFAULT_LOAD_PAGE_SIZE))
+    cur.execute(
+        """
+        PREPARE ins_vendas_stage (int, text, text, text, int, float8, date, float8) AS
+        INSERT INTO vendas_stage (sale_id, product, category, region, quantity, price, sale_date, total)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8);
+        """
+    )
+    execute_batch(
+        cur,
+        "EXECUTE ins_vendas_stage (%s, %s, %s, %s, %s, %s, %s, %s);",
+        values,
+        page_size=page_size,
+    )
+    # Libera o nome do comando preparado: ele vive na sessão, e a conexão
+    # pode ser reaproveitada (pool) por outra execução.
+    cur.execute("DEALLOCATE ins_vendas_stage;")
+
+
+def _insert_with_unnest(cur, values) -> None:
+    """Envia um lote para a staging via um único INSERT sobre unnest() de arrays.
+
+    Em vez de milhares de tuplas no VALUES, enviamos 8 arrays (um por
+    coluna) e o unnest() os "desempacota" de volta em linhas. O PostgreSQL
+    planeja o comando uma única vez, seja o lote de 100 ou de 1 milhão de
+    linhas — no INSERT multi-linha o custo de planejamento cresce com o
+    número de tuplas. O psycopg2 converte listas Python em arrays nativamente.
+    """
+    # zip(*values) transpõe a lista de tuplas-linha em colunas.
+    columns = [list(col) for col in zip(*values)]
+    insert_sql = """
+    INSERT INTO vendas_stage (sale_id, product, category, region, quantity, price, sale_date, total)
+    SELECT * FROM unnest(
+        %s::int[], %s::text[], %s::text[], %s::text[],
+        %s::int[], %s::float8[], %s::date[], %s::float8[]
+    );
+    """
+    cur.execute(insert_sql, columns)
+
+
+def _insert_chunk(cur, values) -> None:
+    """Insere um lote na staging usando a estratégia configurada."""
+    strategy = os.getenv(LOAD_STRATEGY_ENV, "copy").strip().lower()
+    insert = {
+        "values": _insert_with_values,
+        "unnest": _insert_with_unnest,
+    }.get(strategy, _insert_with_copy)
+    insert(cur, values)
+
+
+# DAG (Directed Acyclic Graph): É o "plano" do pipeline no Airflow.
+# - dag_id: Nome único do pipeline.
+# - start_date: Quando começa.
+# - schedule: Frequência (aqui, "@daily" = todos os dias).
+# - catchup: Se deve executar execuções passadas (False = não).
+# - tags: Etiquetas para organizar (ex.: "etl" para extração/transformação/carga).
+@dag(
+    dag_id="sales_etl_pipeline",
+    start_date=START_DATE,
+    schedule="@daily",
+    catchup=False,
+    tags=["etl", "sales"],
+)
+def sales_etl():
+    """
+    Pipeline de vendas com carga paralela por fatias do CSV.
+
+    Explicação: O CSV é dividido em fatias de SALES_CHUNK_ROWS linhas e cada
+    fatia vira uma tarefa mapeada (dynamic task mapping, Airflow 2.3+) que
+    faz parse -> limpeza -> COPY para a staging com sua própria conexão. As
+    fatias rodam em paralelo (até MAX_PARALLEL_LOADS de cada vez), ocupando
+    os vários núcleos do worker; no final, uma única tarefa "merge" move tudo
+    da staging para a tabela vendas descartando duplicatas.
+    """
+
+    # Tarefa 1: Setup — cria as tabelas antes de qualquer carga.
+    @task
+    def setup_tables() -> None:
+        hook = PostgresHook(postgres_conn_id=PG_CONN_ID)
+        conn = hook.get_conn()
+
+        # SQL para criar a tabela se não existir (com colunas definidas).
+        create_sql = """
+        CREATE TABLE IF NOT EXISTS vendas (
+            sale_id INTEGER PRIMARY KEY,  -- ID único da venda.
+            product VARCHAR(255),         -- Nome do produto.
+            category VARCHAR(255),        -- Categoria (ex.: Roupas).
+            region VARCHAR(255),          -- Região (ex.: Sul).
+            quantity INTEGER,             -- Quantidade vendida.
+            price FLOAT,                  -- Preço unitário.
+            sale_date DATE,               -- Data da venda.
+            total FLOAT                   -- Total calculado (quantidade * preço).
+        );
+        """
+        try:
+            with conn.cursor() as cur:
+                cur.execute(create_sql)
+                # Staging UNLOGGED: como ela é descartável (recomeça vazia a
+                # cada execução, via TRUNCATE), não precisa do WAL — o
+                # PostgreSQL pula o diário de transações durante o COPY e só
+                # paga WAL no merge final.
+                cur.execute(
+                    "CREATE UNLOGGED TABLE IF NOT EXISTS vendas_stage (LIKE vendas);"
+                )
+                cur.execute("TRUNCATE vendas_stage;")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        logger.info("Tabelas vendas e vendas_stage prontas")
+
+    # Tarefa 2: Planejamento — divide o CSV em fatias para o mapeamento.
+    @task(retries=1, retry_delay=timedelta(minutes=1))
+    def plan_chunks() -> List[Dict]:
+        csv_path = _csv_path()
+
+        # Verifica se o arquivo existe. Se não, lança erro para parar o pipeline.
+        if not csv_path.exists():
+            raise FileNotFoundError(f"Arquivo CSV não encontrado: {csv_path}")
+
+        # Conta as linhas de dados (descontando o cabeçalho) sem fazer parse:
+        # só uma varredura sequencial do arquivo.
+        with open(csv_path, "rb") as f:
+            data_rows = sum(1 for _ in f) - 1
+
+        chunk_rows = int(os.getenv(CHUNK_ROWS_ENV, DEFAULT_CHUNK_ROWS))
+        chunks = [
+            {"skiprows": offset, "nrows": min(chunk_rows, data_rows - offset)}
+            for offset in range(0, max(data_rows, 0), chunk_rows)
+        ]
+        logger.info("CSV com %d linhas dividido em %d fatias", data_rows, len(chunks))
+        return chunks
+
+    # Tarefa 3 (mapeada): Transform + Load de UMA fatia do CSV.
+    # - Retries: Tenta 2 vezes se falhar, com delay de 5 minutos.
+    # - Timeout: Para se demorar mais de 1 hora.
+    # - max_active_tis_per_dag: Teto de fatias simultâneas (conexões no banco).
+    @task(
+        retries=2,
+        retry_delay=timedelta(minutes=5),
+        execution_timeout=timedelta(hours=1),
+        max_active_tis_per_dag=MAX_PARALLEL_LOADS,
+    )
+    def transform_and_load(chunk: Dict) -> int:
+        df = _read_chunk(_csv_path(), chunk["skiprows"], chunk["nrows"])
+        df = _transform(df)
+        # Logs por fatia ficam em DEBUG: com K fatias mapeadas eles se
+        # multiplicam por K a cada execução, e em produção só o resumo do
+        # merge interessa. Os argumentos via %s só são formatados se o nível
+        # DEBUG estiver ligado (formatação "preguiçosa" do logging).
+        if df.empty:
+            logger.debug("Fatia %s sem linhas válidas", chunk)
+            return 0
+
+        # Cada fatia usa sua própria conexão e transação: as cargas correm em
+        # paralelo e uma fatia que falhar pode ser reexecutada sozinha.
+        hook = PostgresHook(postgres_conn_id=PG_CONN_ID)
+        conn = hook.get_conn()
+        try:
+            with conn.cursor() as cur:
+                _insert_chunk(cur, _row_values(df))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        logger.debug("Fatia %s: %d linhas na staging", chunk, len(df))
+        return len(df)
+
+    # Tarefa 4: Merge — move tudo da staging para a tabela vendas.
+    @task(retries=2, retry_delay=timedelta(minutes=5))
+    def merge(counts: List[int]) -> None:
+        hook = PostgresHook(postgres_conn_id=PG_CONN_ID)
+        conn = hook.get_conn()
+        try:
+            with conn.cursor() as cur:
+                # Um único INSERT ... SELECT com ON CONFLICT descarta as
+                # duplicatas; o ORDER BY sale_id faz as inserções chegarem em
+                # ordem no índice da chave primária (páginas sujas em
+                # sequência, em vez de saltos aleatórios pela árvore).
+                cur.execute(
+                    "INSERT INTO vendas SELECT * FROM vendas_stage ORDER BY sale_id "
+                    "ON CONFLICT (sale_id) DO NOTHING;"
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        logger.info("Carregadas %d linhas (ignorando duplicatas)", sum(counts))
+
+    # Fluxo do DAG: setup e planejamento primeiro; depois uma tarefa mapeada
+    # por fatia (em paralelo); por fim o merge, que espera todas as fatias.
+    ready = setup_tables()
+    chunks = plan_chunks()
+    loaded = transform_and_load.expand(chunk=chunks)
+    ready >> loaded
+    merge(loaded)
+
+# Executa o DAG: Isso registra o pipeline no Airflow para ser executado.
+sales_etl()
@@ -0,0 +1,97 @@
+# Testes das funções auxiliares do DAG de vendas.
+# Essas funções são "puras" (não dependem do Airflow rodando), então podemos
+# testá-las diretamente — o fixture 'dag_module' (tests/conftest.py) importa
+# o módulo do DAG simulando o Airflow, como no smoke test.
+
+
+def test_format_copy_value_escapes_special_chars(dag_module):
+    # Tab, quebra de linha e barra invertida são caracteres de controle do
+    # formato texto do COPY e precisam ser escapados dentro dos campos.
+    assert dag_module._format_copy_value("a\tb") == "a\\tb"
+    assert dag_module._format_copy_value("a\nb") == "a\\nb"
+    assert dag_module._format_copy_value("a\\b") == "a\\\\b"
+    assert dag_module._format_copy_value(10) == "10"
+
+
+def test_format_copy_value_null_markers(dag_module):
+    # None e NaN devem virar "\N", o marcador de NULL do COPY.
+    assert dag_module._format_copy_value(None) == r"\N"
+    assert dag_module._format_copy_value(float("nan")) == r"\N"
+
+
+def test_transform_computes_total_and_drops_invalid_rows(dag_module):
+    import pandas as pd
+
+    df = pd.DataFrame(
+        {
+            "sale_id": [1, 2],
+            "product": ["Boné", "Jaqueta"],
+            "category": ["Acessórios", "Roupas"],
+            "region": ["Sul", "Norte"],
+            "quantity": [2, 3],
+            "price": [10.0, 5.0],
+            # A segunda data é inválida: a linha inteira deve ser descartada.
+            "sale_date": ["2023-01-01", "não é data"],
+        }
+    )
+    out = dag_module._transform(df)
+    assert list(out["sale_id"]) == [1]
+    assert list(out["total"]) == [20.0]
+    # A data sai como datetime.date (str() já é ISO, e o psycopg2 a converte
+    # em DATE nativamente).
+    import datetime
+    assert out["sale_date"].iloc[0] == datetime.date(2023, 1, 1)
+
+
+def test_transform_drops_rows_with_bad_numeric_values(dag_module):
+    import pandas as pd
+
+    df = pd.DataFrame(
+        {
+            # sale_id vazio e quantity não numérica: essas linhas devem ser
+            # descartadas uma a uma, sem abortar a fatia inteira.
+            "sale_id": [1, None, 3],
+            "product": ["Boné", "Tênis", "Meia"],
+            "category": ["Acessórios", "Calçados", "Roupas"],
+            "region": ["Sul", "Norte", "Sul"],
+            "quantity": [2, 1, "muitos"],
+            "price": [10.0, 5.0, 1.0],
+            "sale_date": ["2023-01-01", "2023-01-02", "2023-01-03"],
+        }
+    )
+    out = dag_module._transform(df)
+    assert list(out["sale_id"]) == [1]
+    # Depois do descarte, o esquema tipado é aplicado (int32 para quantity).
+    assert str(out["quantity"].dtype) == "int32"
+
+
+def test_transform_rejects_missing_columns(dag_module):
+    import pandas as pd
+    import pytest
+
+    df = pd.DataFrame({"sale_id": [1], "product": ["Boné"]})
+    with pytest.raises(ValueError):
+        dag_module._transform(df)
+
+
+def test_row_values_follows_table_column_order(dag_module):
+    import pandas as pd
+
+    df = pd.DataFrame(
+        {
+            # Colunas propositalmente fora de ordem: a tupla deve sair na
+            # ordem das colunas da tabela vendas, não na do DataFrame.
+            "total": [20.0],
+            "sale_id": [1],
+            "product": ["Boné"],
+            "category": ["Acessórios"],
+            "region": ["Sul"],
+            "quantity": [2],
+            "price": [10.0],
+            "sale_date": ["2023-01-01"],
+        }
+    )
+    values = dag_module._row_values(df)
+    assert values == [
+        (1, "Boné", "Acessórios", "Sul", 2, 10.0, "2023-01-01", 20.0)
+    ]